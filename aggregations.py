@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# --------------------------------------
+# Cached chart aggregations
+# --------------------------------------
+
+# Each helper is a pure function of the (filtered) frame it receives, so
+# reruns that don't change the filters are served from the cache. Callers
+# pass only the columns a helper needs, which keeps hashing the argument
+# for the cache key cheap.
+# Groupbys on category columns pass observed=True so only combinations
+# that actually occur are built, not the full product of all levels.
+
+@st.cache_data(show_spinner=False)
+def category_counts(s):
+    counts = s.value_counts().reset_index()
+    counts.columns = [s.name, "Count"]
+    return counts
+
+
+@st.cache_data(show_spinner=False)
+def treatment_rate_by_gender(df):
+    return (
+        df
+        .groupby("Gender", observed=True)["treatment"]
+        .mean()
+        .reset_index(name="treatment_rate")
+    )
+
+
+def _count_pairs(df):
+    # Counts every combination of the columns df was narrowed down to in a
+    # single value_counts pass (rows with a missing value are dropped).
+    # Newer pandas also lists unobserved category pairs, hence the > 0.
+    counts = df.value_counts(sort=False)
+    return counts[counts > 0].sort_index()
+
+
+@st.cache_data(show_spinner=False)
+def pair_counts(df):
+    return _count_pairs(df).reset_index(name="Count")
+
+
+def _pair_shares(df):
+    # Like pair_counts, but as the share (%) of each answer in the second
+    # column within every group of the first one, so stacked bars add up
+    # to 100 per group
+    counts = _count_pairs(df)
+    totals = counts.groupby(level=0, observed=True, sort=False).transform("sum")
+    return (100 * counts / totals).reset_index(name="Percent")
+
+
+@st.cache_data(show_spinner=False)
+def top_countries_yes(df, col, n=15):
+    # Yes answers per country by summing the bool is_yes_<col> indicator
+    # from the loader; countries without a Yes are left out, and nlargest
+    # picks the top n without sorting every country
+    yes = df.groupby("Country", observed=True)[f"is_yes_{col}"].sum()
+    return yes[yes > 0].nlargest(n).reset_index(name="Count")
+
+
+@st.cache_data(show_spinner=False)
+def country_pct_yes(df, col, n=15):
+    # Answered rows (count skips missing answers) and Yes answers (sum of
+    # the is_yes_<col> indicator) per country from one groupby
+    per_country = df.groupby("Country", observed=True).agg(
+        answered=(col, "count"), yes=(f"is_yes_{col}", "sum")
+    )
+    per_country = per_country[per_country["answered"] > 0]
+    pct = 100 * per_country["yes"] / per_country["answered"]
+    return pct.nlargest(n).rename("Pct_Yes").reset_index()
+
+
+@st.cache_data(show_spinner=False)
+def age_histogram(df, color, bins=30):
+    # Bin ages here so the chart gets one bar per bin instead of every row;
+    # bins are whole years wide and shared by all colour groups
+    ages = df["Age"].dropna()
+    if ages.empty:
+        return pd.DataFrame(columns=["Age", "Count", color])
+    lo, hi = int(ages.min()), int(ages.max())
+    width = max(1, int(np.ceil((hi - lo + 1) / bins)))
+    edges = np.arange(lo, hi + width + 1, width)
+    centers = edges[:-1] + width / 2
+    frames = []
+    for label, group in df.groupby(color, observed=True)["Age"]:
+        counts, _ = np.histogram(group.dropna(), bins=edges)
+        frames.append(pd.DataFrame({"Age": centers, "Count": counts, color: label}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _treemap_counts(df):
+    # One row per country / company size / treatment leaf instead of one
+    # per respondent. Missing sizes get their own box; adding the level to
+    # the category and filling it only touches integer codes.
+    sizes = (
+        df["no_employees"]
+        .cat.add_categories(["Not specified"])
+        .fillna("Not specified")
+    )
+    return (
+        df.groupby(["Country", sizes, "treatment"], observed=True, sort=False)
+        .size()
+        .reset_index(name="Count")
+    )
+
+
+@st.cache_data(show_spinner=False)
+def workplace_tables(df):
+    # Every Workplace Factors aggregation from one narrow projection, so a
+    # rerun hashes and looks up one cache entry instead of one per chart.
+    # Each table only drops rows missing one of its own columns.
+    pairs = {
+        "size_work": ["no_employees", "work_interfere"],
+        "tech_work": ["tech_company", "work_interfere"],
+        "supervisor": ["supervisor", "treatment"],
+        "tech_benefits": ["tech_company", "benefits"],
+        "benefits_seek": ["benefits", "seek_help"],
+        "anonymity_leave": ["anonymity", "leave"],
+    }
+    tables = {
+        name: _count_pairs(df[cols]).reset_index(name="Count")
+        for name, cols in pairs.items()
+    }
+    tables["size_treatment"] = _pair_shares(df[["no_employees", "treatment"]])
+    tables["treemap"] = _treemap_counts(df[["Country", "no_employees", "treatment"]])
+    return tables
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# --------------------------------------
+# Load & clean data
+# --------------------------------------
+
+def _relabel_categories(col, func):
+    # Apply func to the few distinct labels of a category column instead of
+    # every row, then re-point each row code at its new label. Several raw
+    # labels may collapse into one, which rename_categories can't express.
+    labels = col.cat.categories.map(func)
+    label_codes, new_labels = pd.factorize(labels, sort=True)
+    codes = col.cat.codes.to_numpy()
+    return pd.Categorical.from_codes(
+        np.where(codes >= 0, label_codes[codes], -1),
+        categories=new_labels,
+    )
+
+
+# Shared by every dashboard layout so the survey is parsed and cleaned once.
+# cache_resource hands back the same frame on every rerun instead of
+# unpickling a copy, so callers must treat the result as read-only.
+@st.cache_resource(show_spinner=False)
+def load_and_clean_data():
+    # Category columns
+    cat_cols = [
+        "Gender", "Country", "mental_health_consequence",
+        "phys_health_consequence", "coworkers", "supervisor",
+        "mental_health_interview", "phys_health_interview",
+        "mental_vs_physical", "obs_consequence", "work_interfere",
+        "benefits", "care_options", "leave", "anonymity",
+        "state", "wellness_program"
+    ]
+
+    # Let the C parser produce the final dtypes and generic missing values
+    # directly instead of rewriting every column after loading
+    df = pd.read_csv(
+        "survey.csv",
+        dtype={
+            "no_employees": "category",
+            **{c: "category" for c in cat_cols},
+        },
+        parse_dates=["Timestamp"],
+        date_format="%d/%m/%Y %H:%M",
+        na_values=["", "N/A", "n/a", "Na", "Don't know", "Maybe", "Some of them"],
+    )
+
+    # Basic types
+    df["Age"] = pd.to_numeric(df["Age"], errors="coerce")
+
+    # Clean Gender
+    female_terms = [
+        "female (cis)", "female (cis)\t", "fem", "f", "femal",
+        "woman", "femail", "cis female", "femake",
+        "female (cis)", "queer/she/they", "cis-female/femme"
+    ]
+
+    male_terms = [ "cis man",
+        "msle", "guy (-ish) ^_^", "man", "mal", "make",
+        "male (cis)", "male", "m", "male,m",
+        "male-ish", "malr", "maile", "mail", "cis male",
+        "something kinda male?"
+    ]
+
+    other_terms = [
+        "male leaning androgynous", "male leaning androgyous", "neuter",
+        "trans-female", "unsure what that really means", "trans woman", "p",
+        "genderqueer", "a little about you", "non-binary", "nah", "all",
+        "enby", "female (trans)", "queer", "fluid", "androgyne", "agender",
+        "ostensibly male, unsure what that really means"
+    ]
+
+    gender_map = {
+        **{t: "female" for t in female_terms},
+        **{t: "male" for t in male_terms},
+        **{t: "other" for t in other_terms},
+    }
+
+    def clean_gender(term):
+        term = term.lower().strip()
+        return gender_map.get(term, term)
+
+    df["Gender"] = _relabel_categories(df["Gender"], clean_gender)
+
+    # Clean no_employees into an ordered category (smallest to largest);
+    # company sizes outside size_map (the spreadsheet mangled "jun-25" /
+    # "01-may") are dropped to missing
+    size_map = {
+        "1-5": 3,
+        "6-25": 15,
+        "26-100": 63,
+        "100-500": 300,
+        "500-1000": 750,
+        "more than 1000": 1200,
+    }
+    df["no_employees"] = _relabel_categories(
+        df["no_employees"], lambda t: t.strip().lower()
+    ).set_categories(list(size_map), ordered=True)
+
+    # Keep valid age range
+    df = df[(df["Age"] >= 18) & (df["Age"] <= 100)]
+    df["Age"] = df["Age"].astype("int8")
+    for c in cat_cols:
+        df[c] = df[c].cat.remove_unused_categories()
+
+    # Yes/No columns to bool in one comparison; anything that is not "Yes"
+    # (No, missing) becomes False instead of leaking through as truthy
+    bool_cols = [
+        "treatment", "remote_work", "tech_company", "seek_help",
+        "self_employed", "family_history"
+    ]
+    for c in bool_cols:
+        df[c] = df[c].to_numpy() == "Yes"
+
+    # Strip strings (only the text columns, numeric/bool/category are skipped)
+    obj_cols = df.select_dtypes(include=["object", "string"]).columns
+    df[obj_cols] = df[obj_cols].apply(lambda s: s.str.strip())
+
+    # Remove duplicates
+    df.drop_duplicates(inplace=True)
+
+    # Company size numeric mapping, done on the categories only
+    df["company_size"] = (
+        df["no_employees"].cat.rename_categories(size_map).astype("Int16")
+    )
+
+    # Yes indicators for the per-country charts, so they sum a one-byte
+    # column instead of comparing the answers on every rerun. bool rather
+    # than int8: grouped int8 sums can keep the int8 dtype and wrap.
+    for c in ["mental_health_consequence", "mental_vs_physical"]:
+        df[f"is_yes_{c}"] = (df[c] == "Yes").to_numpy()
+
+    return df
+
+
+# The cleaned frame never changes, so the sidebar choices are computed once.
+# Gender and Country are categories whose unused levels were removed, so
+# their categories are exactly the distinct answers (Country sorted).
+@st.cache_data(show_spinner=False)
+def sidebar_options():
+    df = load_and_clean_data()
+    return {
+        "genders": df["Gender"].cat.categories.tolist(),
+        "countries": df["Country"].cat.categories.tolist(),
+        "age_min": int(df["Age"].min()),
+        "age_max": int(df["Age"].max()),
+    }
+
+
+# --------------------------------------
+# Filter data
+# --------------------------------------
+
+# The result only depends on the sidebar selections, so a repeated
+# combination is a cache hit instead of another pass over the survey.
+# The cleaned frame is fetched from its own cache rather than passed in,
+# which keeps it out of the cache key.
+@st.cache_data(show_spinner=False)
+def filter_responses(genders, age_range, countries, remote_choice, tech_choice):
+    df = load_and_clean_data()
+
+    # Collect every active condition as a NumPy array and AND them in one go
+    conditions = [
+        df["Gender"].isin(genders).to_numpy(),
+        df["Age"].between(age_range[0], age_range[1]).to_numpy(),
+    ]
+
+    if countries:
+        conditions.append(df["Country"].isin(countries).to_numpy())
+
+    if remote_choice != "All":
+        is_remote = (remote_choice == "Remote")
+        conditions.append(df["remote_work"].to_numpy() == is_remote)
+
+    if tech_choice != "All":
+        is_tech = (tech_choice == "Tech only")
+        conditions.append(df["tech_company"].to_numpy() == is_tech)
+
+    return df.loc[np.logical_and.reduce(conditions)]
@@ -0,0 +1,104 @@
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from aggregations import category_counts, country_pct_yes, top_countries_yes
+from data_loader import filter_responses
+
+# --------------------------------------
+# Cached figure specs
+# --------------------------------------
+
+# Builds a Plotly Express chart from an already aggregated (small) frame and
+# caches its serialised spec, so a rerun with the same counts skips figure
+# construction entirely. The follow-up update_* calls are passed as dicts
+# because they are part of what ends up in the spec.
+@st.cache_data(show_spinner=False)
+def figure_spec(kind, data, traces=None, layout=None, yaxes=None, **px_kwargs):
+    fig = getattr(px, kind)(data, **px_kwargs)
+    if traces:
+        fig.update_traces(**traces)
+    if layout:
+        fig.update_layout(**layout)
+    if yaxes:
+        fig.update_yaxes(**yaxes)
+    return fig.to_dict()
+
+
+# Count heatmap from a frame that already has one row per (x, y) cell.
+# The counts are pivoted into a matrix for go.Heatmap, so the browser draws
+# the cells as given instead of re-binning them like px.density_heatmap.
+@st.cache_data(show_spinner=False)
+def heatmap_spec(data, x, y, z, title):
+    mat = data.pivot(index=y, columns=x, values=z).fillna(0).astype(int)
+    fig = go.Figure(go.Heatmap(
+        z=mat.to_numpy(),
+        x=mat.columns.astype(str),
+        y=mat.index.astype(str),
+        colorbar_title=z,
+        hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<br>{z}=%{{z}}<extra></extra>",
+    ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    return fig.to_dict()
+
+
+# --------------------------------------
+# Figures shared across sessions
+# --------------------------------------
+
+# These charts depend on nothing but the sidebar filters, so their specs are
+# built once per filter combination and handed to every session: a hit only
+# hashes the filters tuple and skips filtering, aggregation and figure
+# building. cache_resource doesn't copy the result, so callers must treat
+# the specs as read-only.
+@st.cache_resource(show_spinner=False, max_entries=100)
+def benefits_pie(filters):
+    benefits = filter_responses(*filters)["benefits"].dropna()
+    if benefits.empty:
+        return None
+    return figure_spec(
+        "pie",
+        category_counts(benefits),
+        names="benefits",
+        values="Count",
+        title="Benefits availability",
+        hole=0.4,
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=100)
+def country_figures(filters):
+    df = filter_responses(*filters)
+    figs = {}
+
+    tmp = top_countries_yes(
+        df[["Country", "is_yes_mental_health_consequence"]],
+        "mental_health_consequence",
+    )
+    if not tmp.empty:
+        figs["country_yes"] = figure_spec(
+            "bar",
+            tmp.sort_values("Count"),
+            x="Count",
+            y="Country",
+            orientation="h",
+            title="Countries with highest reported mental health consequences (Yes)",
+        )
+
+    top = country_pct_yes(
+        df[["Country", "mental_vs_physical", "is_yes_mental_vs_physical"]],
+        "mental_vs_physical",
+    )
+    if not top.empty:
+        figs["pct_yes"] = figure_spec(
+            "bar",
+            top,
+            x="Country",
+            y="Pct_Yes",
+            title="Countries with highest % 'Yes' on mental vs physical health",
+            text="Pct_Yes",
+            traces=dict(texttemplate="%{text:.1f}%", textposition="outside"),
+            layout=dict(xaxis_title="Country", yaxis_title="% Yes"),
+        )
+
+    return figs